@@ -0,0 +1,341 @@
+"""
+Shared HTTP plumbing for the API eval scripts: configuration from the
+environment, the pooled keep-alive session and optional httpx stream
+client, cached authentication, bounded/retried POSTs, byte-level SSE
+parsing and a concurrent runner that keeps each call's output together.
+"""
+
+import base64
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import pathlib
+import requests
+from requests.adapters import HTTPAdapter
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+API_BASE_URL = os.getenv("AIDEAS_API_URL", "http://localhost:8080")
+EMAIL = os.getenv("AIDEAS_EMAIL")
+PASSWORD = os.getenv("AIDEAS_PASSWORD")
+
+# Access tokens are reused across runs until they are within a minute of expiring
+TOKEN_CACHE_PATH = pathlib.Path("~/.cache/aideas/token.json").expanduser()
+TOKEN_EXPIRY_MARGIN = 60
+
+# Every request is bounded: connect within 5s, and no more than 120s of
+# silence on a read. For streams the read timeout applies per chunk, so a
+# stalled stream fails instead of hanging while long streams keep going
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 120
+REQUEST_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+MAX_ATTEMPTS = 3
+
+# Shared session: every call reuses a pooled keep-alive connection to the API
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+SESSION.headers.update({"Content-Type": "application/json"})
+
+# Streaming requests go through httpx (HTTP/2 when h2 is installed) if it is
+# available; AIDEAS_STREAM_CLIENT=requests falls back to the shared session
+STREAM_CLIENT = None
+if httpx is not None and os.getenv("AIDEAS_STREAM_CLIENT", "httpx") == "httpx":
+    STREAM_CLIENT = httpx.Client(
+        http2=importlib.util.find_spec("h2") is not None,
+        headers={"Content-Type": "application/json"},
+        timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+    )
+
+# Set by authenticate(); only tokens it obtained are refreshed after a 401
+_authenticated = False
+# Serializes 401 handling so concurrent calls trigger a single re-login
+_reauth_lock = threading.Lock()
+
+# Auth calls are cheap and safe to repeat, so they also retry read timeouts.
+# Generations only retry connection failures (ConnectTimeout included): a
+# read timeout means the server may still be generating, and resending would
+# start a duplicate generation and inflate the measured latency
+AUTH_RETRY_ERRORS = (requests.ConnectionError, requests.Timeout)
+GENERATION_RETRY_ERRORS = (requests.ConnectionError,)
+
+def _post_with_retry(
+    url: str,
+    retry_on: Tuple[Type[Exception], ...] = AUTH_RETRY_ERRORS,
+    **kwargs
+) -> requests.Response:
+    """POST on the shared session with timeouts, retrying retry_on errors with backoff."""
+    kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            return SESSION.post(url, **kwargs)
+        except retry_on as e:
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+            delay = 2 ** attempt
+            print(f"⚠️  {type(e).__name__} on POST {url}, retrying in {delay}s "
+                  f"(attempt {attempt + 2}/{MAX_ATTEMPTS})")
+            time.sleep(delay)
+
+def register_or_login() -> str:
+    """Login, or register a beta user if the account does not exist yet, return access token."""
+    # The user almost always exists already, so try login first
+    login_response = _post_with_retry(
+        f"{API_BASE_URL}/api/auth/login",
+        json={"email": EMAIL, "password": PASSWORD}
+    )
+
+    if login_response.status_code == 200:
+        data = login_response.json()
+        return data["access_token"]
+
+    if login_response.status_code not in (400, 401, 404):
+        login_response.raise_for_status()
+
+    # Login failed, try registering as beta user
+    print("ℹ️  Login failed, registering beta user...")
+    response = _post_with_retry(
+        f"{API_BASE_URL}/api/auth/register/beta",
+        json={"email": EMAIL, "password": PASSWORD}
+    )
+
+    if response.status_code == 200:
+        print("✅ Registered new beta user")
+        data = response.json()
+        return data["access_token"]
+
+    # The user exists, so the login failure was the real problem (e.g. wrong password)
+    if "already exists" in response.text.lower():
+        login_response.raise_for_status()
+
+    # Something else went wrong
+    response.raise_for_status()
+    return ""
+
+def _token_expiry(token: str) -> Optional[float]:
+    """Return the JWT `exp` claim without verifying the signature, or None."""
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"])
+    except (IndexError, ValueError, KeyError, TypeError):
+        return None
+
+def get_token() -> str:
+    """Return a cached access token for this API/user, re-authenticating when it is about to expire."""
+    try:
+        cached = json.loads(TOKEN_CACHE_PATH.read_text())
+        if (
+            cached.get("api_url") == API_BASE_URL
+            and cached.get("email") == EMAIL
+            and cached["exp"] - time.time() > TOKEN_EXPIRY_MARGIN
+        ):
+            return cached["token"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    token = register_or_login()
+    exp = _token_expiry(token)
+    if exp is not None:
+        # Create the file owner-only from the start, then rename it into place
+        tmp_path = TOKEN_CACHE_PATH.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            TOKEN_CACHE_PATH.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            fd = os.open(tmp_path, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump({
+                    "api_url": API_BASE_URL,
+                    "email": EMAIL,
+                    "token": token,
+                    "exp": exp
+                }, f)
+            os.replace(tmp_path, TOKEN_CACHE_PATH)
+        except OSError:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+    return token
+
+def authenticate() -> str:
+    """Get an access token and attach it to both the shared session and the stream client."""
+    global _authenticated
+    token = get_token()
+    SESSION.headers["Authorization"] = f"Bearer {token}"
+    if STREAM_CLIENT is not None:
+        STREAM_CLIENT.headers["Authorization"] = f"Bearer {token}"
+    _authenticated = True
+    return token
+
+def _reauthenticate(response: Any) -> bool:
+    """
+    Handle a 401 response by dropping the cached token and logging in again.
+    The server can reject a token before its exp (e.g. a rotated signing
+    key). If another thread already replaced the rejected token, only the
+    retry is needed. Returns False if the token was not obtained by
+    authenticate(), in which case the request should not be repeated.
+    """
+    if not _authenticated:
+        return False
+    rejected = response.request.headers.get("Authorization")
+    with _reauth_lock:
+        if SESSION.headers.get("Authorization") == rejected:
+            try:
+                TOKEN_CACHE_PATH.unlink()
+            except OSError:
+                pass
+            authenticate()
+    return True
+
+def post(url: str, **kwargs) -> requests.Response:
+    """
+    POST a generation request with timeouts, retrying connection failures only.
+    On a 401, re-authenticate once and repeat the request.
+    """
+    response = _post_with_retry(url, retry_on=GENERATION_RETRY_ERRORS, **kwargs)
+    if response.status_code == 401 and _reauthenticate(response):
+        response = _post_with_retry(url, retry_on=GENERATION_RETRY_ERRORS, **kwargs)
+    return response
+
+class _ThreadLocalStdout(io.TextIOBase):
+    """sys.stdout stand-in that sends each worker thread's prints to its own buffer."""
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+        self._local = threading.local()
+
+    def capture(self, buffer):
+        self._local.buffer = buffer
+
+    def write(self, s):
+        return getattr(self._local, "buffer", self.fallback).write(s)
+
+    def flush(self):
+        self.fallback.flush()
+
+def run_concurrently(calls: List[Callable[[], Any]]) -> List[Any]:
+    """
+    Run independent API calls on a thread pool and return their results in order.
+    Each call's prints are buffered and written as one block, in order, so
+    concurrent output stays readable. The first exception raised is re-raised.
+    """
+    stdout = _ThreadLocalStdout(sys.stdout)
+
+    def run(call):
+        buffer = io.StringIO()
+        stdout.capture(buffer)
+        try:
+            return call(), buffer
+        except Exception as e:
+            return e, buffer
+
+    sys.stdout = stdout
+    try:
+        with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+            outcomes = list(executor.map(run, calls))
+    finally:
+        sys.stdout = stdout.fallback
+
+    results = []
+    for result, buffer in outcomes:
+        sys.stdout.write(buffer.getvalue())
+        if isinstance(result, Exception):
+            raise result
+        results.append(result)
+    return results
+
+def _open_stream(url: str, body: bytes) -> contextlib.AbstractContextManager:
+    """Start a streaming POST on the httpx client if available, else on the shared session."""
+    if STREAM_CLIENT is not None:
+        return STREAM_CLIENT.stream("POST", url, content=body)
+    return SESSION.post(url, data=body, stream=True, timeout=REQUEST_TIMEOUT)
+
+@contextlib.contextmanager
+def stream_post(url: str, body: bytes) -> Iterator[Any]:
+    """
+    POST a pre-encoded body and yield the streaming response, closing it on exit.
+    A 401 re-authenticates once and repeats the request before yielding.
+    """
+    with _open_stream(url, body) as response:
+        if response.status_code != 401 or not _reauthenticate(response):
+            yield response
+            return
+
+    with _open_stream(url, body) as response:
+        yield response
+
+def _sse_event_data(frame: bytes) -> Optional[bytes]:
+    """Join the data fields of one SSE event with newlines, per the SSE spec."""
+    data_lines = []
+    for line in frame.split(b"\n"):
+        field, _, value = line.partition(b":")
+        if field == b"data":
+            data_lines.append(value[1:] if value.startswith(b" ") else value)
+    return b"\n".join(data_lines) if data_lines else None
+
+def iter_sse_events(
+    response: Any,
+    on_first_byte: Optional[Callable[[], None]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the JSON payload of each SSE event in a streaming response.
+    Reads raw bytes as they arrive (httpx iter_bytes, or read1 on a
+    requests response) instead of iter_lines(), calls
+    on_first_byte as soon as the first body byte is received, and only
+    parses an event once its blank-line delimiter has arrived, so events
+    split across network chunks are reassembled rather than dropped.
+    Multi-line data fields are concatenated; non-JSON payloads are skipped.
+    """
+    if hasattr(response, "iter_bytes"):
+        chunks = response.iter_bytes()
+    else:
+        raw = response.raw
+        raw.decode_content = True
+        read = getattr(raw, "read1", None)
+        chunks = iter(lambda: read(65536), b"") if read else response.iter_content(chunk_size=None)
+
+    buffer = bytearray()
+    carry = b""
+
+    for chunk in chunks:
+        if on_first_byte is not None:
+            on_first_byte()
+            on_first_byte = None
+
+        # Normalize CRLF/CR to LF; hold back a trailing CR in case its LF is in the next chunk
+        chunk = carry + chunk
+        carry = b"\r" if chunk.endswith(b"\r") else b""
+        if carry:
+            chunk = chunk[:-1]
+        buffer += chunk.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+        while True:
+            end = buffer.find(b"\n\n")
+            if end < 0:
+                break
+            data = _sse_event_data(bytes(buffer[:end]))
+            del buffer[:end + 2]
+            if data is None:
+                continue
+            try:
+                yield json.loads(data)
+            except json.JSONDecodeError:
+                continue
+
+    # A final event without a trailing blank line is still delivered
+    data = _sse_event_data(bytes(buffer))
+    if data is not None:
+        try:
+            yield json.loads(data)
+        except json.JSONDecodeError:
+            pass
@@ -3,9 +3,13 @@
 from .chord_scorer import score_chord_detection
 from .key_scorer import score_key_validation
 from .content_scorer import score_content_type
+from .batch import score_row, score_all, score_batch
 
 __all__ = [
     'score_chord_detection',
     'score_key_validation',
     'score_content_type',
+    'score_row',
+    'score_all',
+    'score_batch',
 ]
@@ -0,0 +1,100 @@
+"""
+Numeric kernels for the scorers' hot loops.
+Uses the compiled Cython extension (_kernels_c) when it has been built,
+else Numba when it is installed, else equivalent NumPy implementations,
+so neither Cython nor Numba is a hard dependency.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+try:
+    from . import _kernels_c
+    BACKEND = 'cython'
+except ImportError:
+    _kernels_c = None
+    try:
+        from numba import njit
+        BACKEND = 'numba'
+    except ImportError:
+        BACKEND = 'numpy'
+
+
+if BACKEND == 'numba':
+    @njit(cache=True)
+    def _group_onsets(starts):
+        n = starts.size
+        first = np.empty(n, dtype=np.int64)
+        sizes = np.empty(n, dtype=np.int64)
+        groups = 0
+        i = 0
+        while i < n:
+            j = i + 1
+            while j < n and starts[j] == starts[i]:
+                j += 1
+            first[groups] = i
+            sizes[groups] = j - i
+            groups += 1
+            i = j
+        return first[:groups], sizes[:groups]
+
+    @njit(cache=True)
+    def _pc_histogram(pitches, weights, out):
+        for i in range(pitches.size):
+            out[pitches[i] % 12] += weights[i]
+
+
+def group_onsets(starts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split sorted onsets into runs of equal values.
+
+    Args:
+        starts: Onset times, sorted ascending
+
+    Returns:
+        (first, sizes): index of each run's first note and its length
+    """
+    if BACKEND == 'cython':
+        return _kernels_c.group_onsets(np.ascontiguousarray(starts, dtype=np.int32))
+    if BACKEND == 'numba':
+        return _group_onsets(starts)
+
+    bounds = np.flatnonzero(np.diff(starts)) + 1
+    first = np.concatenate(([0], bounds)) if starts.size else bounds
+    sizes = np.diff(np.concatenate((first, [starts.size])))
+    return first, sizes
+
+
+def pc_histogram(pitches: np.ndarray, weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Build a 12-bin pitch-class histogram.
+
+    Args:
+        pitches: MIDI pitch numbers
+        weights: Optional per-note weights (e.g. durations)
+
+    Returns:
+        float64 array of length 12
+    """
+    if weights is None:
+        weights = np.ones(pitches.size)
+
+    if BACKEND == 'cython':
+        out = np.zeros(12)
+        _kernels_c.pc_histogram(
+            np.ascontiguousarray(pitches, dtype=np.int8),
+            np.ascontiguousarray(weights, dtype=np.float64),
+            out,
+        )
+        return out
+    if BACKEND == 'numba':
+        out = np.zeros(12)
+        _pc_histogram(pitches, np.asarray(weights, dtype=np.float64), out)
+        return out
+
+    return np.bincount(
+        np.asarray(pitches, dtype=np.intp) % 12,
+        weights=weights,
+        minlength=12,
+    ).astype(np.float64)
@@ -0,0 +1,36 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Cython build of the scorer kernels in _kernels.py.
+Build in place with: python setup_kernels.py build_ext --inplace
+"""
+
+import numpy as np
+
+
+def group_onsets(const int[::1] starts):
+    """Split sorted int32 onsets into runs; returns (first, sizes) int64 arrays."""
+    cdef Py_ssize_t n = starts.shape[0]
+    cdef Py_ssize_t i = 0, j, groups = 0
+
+    first = np.empty(n, dtype=np.int64)
+    sizes = np.empty(n, dtype=np.int64)
+    cdef long long[::1] first_v = first
+    cdef long long[::1] sizes_v = sizes
+
+    while i < n:
+        j = i + 1
+        while j < n and starts[j] == starts[i]:
+            j += 1
+        first_v[groups] = i
+        sizes_v[groups] = j - i
+        groups += 1
+        i = j
+
+    return first[:groups], sizes[:groups]
+
+
+def pc_histogram(const signed char[::1] pitches, const double[::1] weights, double[::1] out):
+    """Accumulate weights of int8 pitches into the 12-bin float64 out array."""
+    cdef Py_ssize_t i
+    for i in range(pitches.shape[0]):
+        out[pitches[i] % 12] += weights[i]
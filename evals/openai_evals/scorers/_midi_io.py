@@ -0,0 +1,217 @@
+"""
+MIDI I/O helpers shared by the scorers.
+Parses base64-encoded MIDI with symusic instead of music21 and keeps the
+notes as flat NumPy arrays, cached in memory and on disk.
+"""
+
+import binascii
+import hashlib
+import os
+import tempfile
+import zipfile
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+from symusic import Score
+
+from ._kernels import pc_histogram
+
+
+# Content-addressed cache of parsed MIDI, one .npz file per distinct base64 payload.
+# Bump NOTE_CACHE_VERSION whenever the NoteArray layout or ordering changes.
+NOTE_CACHE_VERSION = 2
+MIDI_CACHE_DIR = Path(os.environ.get(
+    'AIDEAS_MIDI_CACHE',
+    os.path.join(tempfile.gettempdir(), 'aideas_midi_cache'),
+))
+
+
+TONIC_NAMES = ['C', 'C#', 'D', 'Eb', 'E', 'F', 'F#', 'G', 'Ab', 'A', 'Bb', 'B']
+
+# Krumhansl-Kessler key profiles, indexed by pitch class relative to the tonic
+MAJOR_PROFILE = np.array([6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88])
+MINOR_PROFILE = np.array([6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17])
+
+
+def _build_key_profiles() -> np.ndarray:
+    """
+    Stack the 24 rotated key profiles into a (24, 12) matrix.
+    Rows 0-11 are major keys on C..B, rows 12-23 the minor keys.
+    Each row is centered and unit-normalized so a single matmul with a
+    centered histogram ranks keys exactly like Pearson correlation.
+    """
+    profiles = np.array(
+        [np.roll(MAJOR_PROFILE, i) for i in range(12)]
+        + [np.roll(MINOR_PROFILE, i) for i in range(12)]
+    )
+    profiles -= profiles.mean(axis=1, keepdims=True)
+    profiles /= np.linalg.norm(profiles, axis=1, keepdims=True)
+    return profiles
+
+
+KEY_PROFILES = _build_key_profiles()
+
+
+def parse_midi_base64(midi_base64: str) -> Score:
+    """
+    Parse base64-encoded MIDI data into a symusic Score (tick time).
+    Decodes with binascii.a2b_base64, which reads the ASCII str directly,
+    skipping the str -> bytes copy base64.b64decode makes. Non-alphabet
+    characters are discarded as with b64decode(validate=False), and the
+    decoded bytes go straight to symusic without a BytesIO wrapper.
+    """
+    return Score.from_midi(binascii.a2b_base64(midi_base64))
+
+
+@dataclass
+class NoteArray:
+    """
+    All notes of a MIDI file as parallel arrays (one entry per note).
+    This struct-of-arrays layout is what every scorer consumes: chord
+    grouping, pitch statistics and key histograms are NumPy operations on
+    these columns rather than loops over note objects.
+
+    Notes are sorted by onset, then pitch. Times are in ticks; divide by
+    ticks_per_quarter for beats. Track metadata arrays have one entry per
+    track, including empty ones.
+    """
+    pitch: np.ndarray           # int8 MIDI pitch
+    start: np.ndarray           # int32 onset
+    duration: np.ndarray        # int32 length
+    velocity: np.ndarray        # int8
+    track: np.ndarray           # int32 index into the track_* arrays
+    track_names: np.ndarray     # str
+    track_programs: np.ndarray  # int16 General MIDI program
+    track_is_drum: np.ndarray   # bool
+    ticks_per_quarter: int
+
+    @classmethod
+    def from_score(cls, score: Score) -> 'NoteArray':
+        """Flatten a symusic Score into a NoteArray."""
+        tracks = [track.notes.numpy() for track in score.tracks]
+        counts = [notes['pitch'].size for notes in tracks]
+
+        def column(name: str, dtype) -> np.ndarray:
+            if not tracks:
+                return np.empty(0, dtype=dtype)
+            return np.concatenate([notes[name] for notes in tracks]).astype(dtype, copy=False)
+
+        pitch = column('pitch', np.int8)
+        start = column('time', np.int32)
+        order = np.lexsort((pitch, start))
+
+        return cls(
+            pitch=pitch[order],
+            start=start[order],
+            duration=column('duration', np.int32)[order],
+            velocity=column('velocity', np.int8)[order],
+            track=np.repeat(np.arange(len(tracks), dtype=np.int32), counts)[order],
+            track_names=np.array([t.name for t in score.tracks], dtype=np.str_),
+            track_programs=np.array([t.program for t in score.tracks], dtype=np.int16),
+            track_is_drum=np.array([t.is_drum for t in score.tracks], dtype=bool),
+            ticks_per_quarter=int(score.ticks_per_quarter),
+        )
+
+    @property
+    def num_tracks(self) -> int:
+        return len(self.track_names)
+
+    def save(self, path: Path) -> None:
+        """Write the arrays to an uncompressed .npz file."""
+        with open(path, 'wb') as f:
+            np.savez(
+                f,
+                pitch=self.pitch,
+                start=self.start,
+                duration=self.duration,
+                velocity=self.velocity,
+                track=self.track,
+                track_names=self.track_names,
+                track_programs=self.track_programs,
+                track_is_drum=self.track_is_drum,
+                ticks_per_quarter=np.int32(self.ticks_per_quarter),
+            )
+
+    @classmethod
+    def load(cls, path: Path) -> 'NoteArray':
+        """Read a NoteArray written by save()."""
+        with np.load(path) as data:
+            return cls(
+                pitch=data['pitch'],
+                start=data['start'],
+                duration=data['duration'],
+                velocity=data['velocity'],
+                track=data['track'],
+                track_names=data['track_names'],
+                track_programs=data['track_programs'],
+                track_is_drum=data['track_is_drum'],
+                ticks_per_quarter=int(data['ticks_per_quarter']),
+            )
+
+
+# Number of parsed payloads kept in memory by load_notes()
+NOTE_MEMORY_CACHE_SIZE = 32
+
+
+@lru_cache(maxsize=NOTE_MEMORY_CACHE_SIZE)
+def load_notes(midi_base64: str) -> NoteArray:
+    """
+    Decode base64 MIDI into a NoteArray, using the in-memory and disk caches.
+    The three scorers run on the same output for each eval row, and eval
+    suites re-score the same MIDI across runs, so parsing happens at most
+    once per distinct payload. Callers must not mutate the returned arrays.
+    Use load_notes.cache_clear() between batches to release memory.
+    """
+    key = hashlib.sha256(midi_base64.encode('utf-8')).hexdigest()
+    path = MIDI_CACHE_DIR / f'{key}.v{NOTE_CACHE_VERSION}.npz'
+
+    try:
+        return NoteArray.load(path)
+    except FileNotFoundError:
+        pass
+    except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+        # Truncated or corrupt entry: drop it so it is rewritten below
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    notes = NoteArray.from_score(parse_midi_base64(midi_base64))
+
+    # Write to a private temp file then rename, so concurrent workers never
+    # read a partially written entry
+    tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+    try:
+        MIDI_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        notes.save(tmp_path)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+    return notes
+
+
+def krumhansl_key(pitches: np.ndarray, weights: Optional[np.ndarray] = None) -> Optional[Tuple[str, str]]:
+    """
+    Estimate the key of a set of notes with the Krumhansl-Schmuckler algorithm.
+
+    Args:
+        pitches: MIDI pitch numbers
+        weights: Optional per-note weights (e.g. durations)
+
+    Returns:
+        (tonic_name, mode) tuple, e.g. ('A', 'minor'), or None when there
+        is no pitch content to correlate (empty histogram)
+    """
+    histogram = pc_histogram(pitches, weights)
+    if not histogram.sum() > 0:
+        return None
+    correlations = KEY_PROFILES @ (histogram - histogram.mean())
+    best = int(np.argmax(correlations))
+    return TONIC_NAMES[best % 12], 'major' if best < 12 else 'minor'
@@ -0,0 +1,101 @@
+"""
+Batch Scoring
+Runs all scorers over many eval rows, either across a process pool (score_all)
+or with MIDI parsing overlapped on a thread pool (score_batch).
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from ._midi_io import NOTE_MEMORY_CACHE_SIZE, load_notes
+from .chord_scorer import score_chord_detection
+from .content_scorer import score_content_type
+from .key_scorer import score_key_validation
+
+
+def score_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run every scorer on a single eval row.
+
+    Args:
+        row: Dict with 'output' (API response containing midi_base64)
+             and 'expected' (expected properties from test_cases.jsonl)
+
+    Returns:
+        Dict mapping scorer name to its result
+    """
+    output = row.get('output', {})
+    expected = row.get('expected', {})
+
+    # All three scorers hit the same parse cache for this row's MIDI
+    return {
+        'chord_detection': score_chord_detection(output, expected),
+        'key_validation': score_key_validation(output, expected),
+        'content_type': score_content_type(output, expected),
+    }
+
+
+def score_all(rows: List[Dict[str, Any]], max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Score a batch of eval rows in parallel.
+
+    Scoring is CPU-bound (MIDI parsing and analysis), so rows are spread
+    over a process pool rather than threads. Results keep the input order.
+
+    Args:
+        rows: Eval rows, see score_row()
+        max_workers: Worker processes (defaults to os.cpu_count())
+
+    Returns:
+        List of per-row scorer results
+    """
+    if len(rows) <= 1:
+        return [score_row(row) for row in rows]
+
+    workers = min(max_workers or os.cpu_count() or 1, len(rows))
+    chunksize = max(1, min(8, len(rows) // workers))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(score_row, rows, chunksize=chunksize))
+
+
+def _preload(midi_base64: str) -> None:
+    """Parse one payload into the load_notes cache; scoring reports any error."""
+    try:
+        load_notes(midi_base64)
+    except Exception:
+        pass
+
+
+def score_batch(rows: List[Dict[str, Any]], max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Score a batch of eval rows, parsing their MIDI concurrently.
+
+    symusic parses (and NumPy loads cached arrays) with the GIL released,
+    so a thread pool overlaps the decode/parse step for every distinct
+    payload without pickling parsed notes between processes. Rows are
+    handled in windows that fit the in-memory parse cache, then scored in
+    order on the calling thread.
+
+    Args:
+        rows: Eval rows, see score_row()
+        max_workers: Parser threads (defaults to os.cpu_count())
+
+    Returns:
+        List of per-row scorer results
+    """
+    results = []
+    workers = max_workers or os.cpu_count() or 1
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for lo in range(0, len(rows), NOTE_MEMORY_CACHE_SIZE):
+            window = rows[lo:lo + NOTE_MEMORY_CACHE_SIZE]
+            payloads = {row.get('output', {}).get('midi_base64') for row in window}
+            payloads.discard(None)
+            payloads.discard('')
+
+            list(executor.map(_preload, payloads))
+            results.extend(score_row(row) for row in window)
+
+    return results
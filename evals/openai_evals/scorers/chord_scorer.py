@@ -3,50 +3,179 @@ Chord Detection Scorer
 Evaluates whether the generated MIDI contains valid chords at expected positions.
 """
 
-from music21 import converter, chord as m21_chord, note, stream
-from typing import Dict, Any, List
+from typing import Dict, Any, FrozenSet, List, Set
+
+import numpy as np
+
+from ._kernels import group_onsets
+from ._midi_io import TONIC_NAMES, NoteArray, load_notes
+
+
+# Chord quality suffix by interval set above the root
+_CHORD_QUALITIES = {
+    '': (0, 4, 7),
+    'm': (0, 3, 7),
+    'dim': (0, 3, 6),
+    'aug': (0, 4, 8),
+    'sus2': (0, 2, 7),
+    'sus4': (0, 5, 7),
+    '5': (0, 7),
+    '6': (0, 4, 7, 9),
+    'm6': (0, 3, 7, 9),
+    'add9': (0, 2, 4, 7),
+    'madd9': (0, 2, 3, 7),
+    '7': (0, 4, 7, 10),
+    'maj7': (0, 4, 7, 11),
+    'm7': (0, 3, 7, 10),
+    'mMaj7': (0, 3, 7, 11),
+    'm7b5': (0, 3, 6, 10),
+    'dim7': (0, 3, 6, 9),
+    '7sus4': (0, 5, 7, 10),
+    '7#5': (0, 4, 8, 10),
+    'maj7#5': (0, 4, 8, 11),
+    '7b9': (0, 1, 4, 7, 10),
+    '9': (0, 2, 4, 7, 10),
+    'maj9': (0, 2, 4, 7, 11),
+    'm9': (0, 2, 3, 7, 10),
+    '11': (0, 2, 4, 5, 7, 10),
+    'm11': (0, 2, 3, 5, 7, 10),
+    '13': (0, 2, 4, 7, 9, 10),
+    'maj13': (0, 2, 4, 7, 9, 11),
+    'm13': (0, 2, 3, 7, 9, 10),
+}
+
+
+def _build_no_fifth_names() -> Dict[FrozenSet[int], str]:
+    """Map the no-5th voicings of 4+ note qualities to their suffixes."""
+    names = {}
+    for suffix, iv in _CHORD_QUALITIES.items():
+        if len(iv) >= 4 and 7 in iv:
+            names.setdefault(frozenset(iv) - {7}, suffix)
+    return names
+
+
+# Root-relative interval sets to quality suffixes. No-5th voicings are kept
+# apart because some alias full chords on another root (C6 without its 5th
+# is C-E-A, i.e. Am/C), so they are only tried once no full match exists
+CHORD_NAMES = {frozenset(iv): suffix for suffix, iv in _CHORD_QUALITIES.items()}
+NO_FIFTH_CHORD_NAMES = _build_no_fifth_names()
+
+
+def note_name(pitch: int) -> str:
+    """MIDI pitch to scientific pitch name, e.g. 61 -> 'C#4'."""
+    return f'{TONIC_NAMES[pitch % 12]}{pitch // 12 - 1}'
+
+
+def chord_symbol(pitches: List[int]) -> str:
+    """
+    Name a chord from its MIDI pitches, e.g. [55, 59, 62, 65] -> 'G7'.
+    Tries the bass note as root first, then every other chord tone, so
+    inversions fold onto the same quality (non-bass roots get a slash bass).
+    Full voicings on any root win over no-5th voicings.
+    Falls back to music21 for voicings outside both tables, if installed.
+    """
+    bass = min(pitches) % 12
+    pcs = {p % 12 for p in pitches}
+    roots = [bass] + sorted(pcs - {bass})
+
+    for names in (CHORD_NAMES, NO_FIFTH_CHORD_NAMES):
+        for root in roots:
+            suffix = names.get(frozenset((pc - root) % 12 for pc in pcs))
+            if suffix is not None:
+                symbol = TONIC_NAMES[root] + suffix
+                return symbol if root == bass else f'{symbol}/{TONIC_NAMES[bass]}'
+
+    try:
+        from music21 import chord as m21_chord
+    except ImportError:
+        return 'unknown'
+    return m21_chord.Chord(pitches).pitchedCommonName
 
 
-def parse_midi_base64(midi_base64: str) -> stream.Stream:
-    """Parse base64-encoded MIDI data into music21 Stream."""
-    import base64
-    import io
+def _rotations(intervals: FrozenSet[int]) -> Set[int]:
+    """Pitch-class masks of an interval set on all 12 roots."""
+    return {sum(1 << ((root + iv) % 12) for iv in intervals) for root in range(12)}
 
-    midi_bytes = base64.b64decode(midi_base64)
-    return converter.parse(io.BytesIO(midi_bytes))
 
+def _is_seventh_quality(suffix: str) -> bool:
+    """Whether a chord quality contains a seventh (m7/M7 above the root, or dim7)."""
+    intervals = _CHORD_QUALITIES[suffix]
+    return 10 in intervals or 11 in intervals or suffix == 'dim7'
 
-def extract_chords(score: stream.Stream) -> List[Dict[str, Any]]:
+
+def _build_seventh_chord_masks() -> FrozenSet[int]:
+    """
+    Every pitch-class mask that chord_symbol() names as a seventh chord.
+    Mirrors its lookup order: a no-5th seventh voicing only counts when the
+    same pitch classes do not form a full chord on another root (C-D-G is
+    Csus2, not D7sus4 without its 5th).
     """
-    Extract chords from a music21 score.
-    Returns list of dicts with {beat, chord_symbol, notes}.
+    full_masks = set()
+    seventh_masks = set()
+    for intervals, suffix in CHORD_NAMES.items():
+        masks = _rotations(intervals)
+        full_masks |= masks
+        if _is_seventh_quality(suffix):
+            seventh_masks |= masks
+    for intervals, suffix in NO_FIFTH_CHORD_NAMES.items():
+        if _is_seventh_quality(suffix):
+            seventh_masks |= _rotations(intervals) - full_masks
+    return frozenset(seventh_masks)
+
+
+SEVENTH_CHORD_MASKS = _build_seventh_chord_masks()
+
+# Qualities that must (True) or must not (False) count as seventh chords
+_SEVENTH_CHECKS = {
+    '': False, 'm': False, 'sus2': False, 'add9': False, 'madd9': False,
+    '7': True, 'maj7': True, 'm7': True, 'm7b5': True, 'dim7': True,
+}
+for _suffix, _expected in _SEVENTH_CHECKS.items():
+    if any((mask in SEVENTH_CHORD_MASKS) != _expected
+           for mask in _rotations(frozenset(_CHORD_QUALITIES[_suffix]))):
+        raise RuntimeError(f'SEVENTH_CHORD_MASKS misclassifies {_suffix or "major"} chords')
+
+
+def pitch_class_mask(pitches: List[int]) -> int:
+    """Bitmask with bit n set when pitch class n occurs in pitches."""
+    mask = 0
+    for pitch in pitches:
+        mask |= 1 << (pitch % 12)
+    return mask
+
+
+def extract_chords(notes: NoteArray) -> List[Dict[str, Any]]:
+    """
+    Extract chords from parsed MIDI notes.
+    Notes sharing the same onset within one pitched track form one chord;
+    drum tracks are skipped. Chords are ordered by beat, then track.
+    Returns list of dicts with {beat, chord_symbol, notes, pc_mask}.
     """
     chords = []
 
-    # Flatten the score to get all notes in sequence
-    flat = score.flatten()
-
-    # Try to extract explicit chord symbols first
-    chord_symbols = flat.getElementsByClass(m21_chord.Chord)
-
-    if chord_symbols:
-        for chord_obj in chord_symbols:
-            chords.append({
-                'beat': chord_obj.offset,
-                'chord_symbol': chord_obj.pitchedCommonName,
-                'notes': [p.nameWithOctave for p in chord_obj.pitches]
-            })
-    else:
-        # Analyze vertical slices to find chords
-        chordified = flat.chordify()
-        for element in chordified.flatten().notesAndRests:
-            if isinstance(element, m21_chord.Chord):
-                chords.append({
-                    'beat': element.offset,
-                    'chord_symbol': element.pitchedCommonName,
-                    'notes': [p.nameWithOctave for p in element.pitches]
-                })
-
+    # Reorder pitched notes by (track, onset, pitch) so each track's onset
+    # is a contiguous run, then number the runs for group_onsets
+    pitched = np.flatnonzero(~notes.track_is_drum[notes.track])
+    order = pitched[np.lexsort((notes.pitch[pitched], notes.start[pitched], notes.track[pitched]))]
+    track = notes.track[order]
+    start = notes.start[order]
+    pitch = notes.pitch[order]
+
+    new_run = (np.diff(track) != 0) | (np.diff(start) != 0)
+    run_ids = np.concatenate(([0], np.cumsum(new_run)))[:order.size]
+    first, sizes = group_onsets(run_ids)
+    is_chord = sizes >= 2
+
+    for lo, size in zip(first[is_chord].tolist(), sizes[is_chord].tolist()):
+        pitches = pitch[lo:lo + size].tolist()
+        chords.append({
+            'beat': int(start[lo]) / notes.ticks_per_quarter,
+            'chord_symbol': chord_symbol(pitches),
+            'notes': [note_name(p) for p in pitches],
+            'pc_mask': pitch_class_mask(pitches)
+        })
+
+    chords.sort(key=lambda c: c['beat'])
     return chords
 
 
@@ -71,8 +200,7 @@ def score_chord_detection(output: Dict[str, Any], expected: Dict[str, Any]) -> D
                 'chords_found': 0
             }
 
-        score_stream = parse_midi_base64(midi_data)
-        chords = extract_chords(score_stream)
+        chords = extract_chords(load_notes(midi_data))
 
         # Check minimum chord count
         min_chords = expected.get('min_chords', 4)
@@ -91,7 +219,7 @@ def score_chord_detection(output: Dict[str, Any], expected: Dict[str, Any]) -> D
         # Check for 7th chords if required
         has_7ths_required = expected.get('requires_7ths', False)
         if has_7ths_required:
-            has_7ths = any('7' in c['chord_symbol'] for c in chords)
+            has_7ths = any(c['pc_mask'] in SEVENTH_CHORD_MASKS for c in chords)
             if not has_7ths:
                 return {
                     'score': 0.5,
@@ -6,48 +6,111 @@ Evaluates whether the output contains the expected content type:
 - full_arrangement (chords + melody + bass)
 """
 
-from music21 import converter, instrument, stream
+import numpy as np
 from typing import Dict, Any, List
-import base64
-import io
 
+from ._midi_io import NoteArray, load_notes
 
-def parse_midi_base64(midi_base64: str) -> stream.Stream:
-    """Parse base64-encoded MIDI data into music21 Stream."""
-    midi_bytes = base64.b64decode(midi_base64)
-    return converter.parse(io.BytesIO(midi_bytes))
 
+def track_pitch_stats(notes: NoteArray) -> Dict[str, np.ndarray]:
+    """
+    Compute per-track note counts and pitch statistics at once.
+    Drum tracks are counted but not pitched: their note numbers select
+    kit pieces, so pitch statistics for them are meaningless.
+
+    Returns:
+        Dict of arrays indexed by track: counts, pitched, avg_pitch, pitch_range
+    """
+    num_tracks = notes.num_tracks
+    counts = np.bincount(notes.track, minlength=num_tracks)
+    sums = np.bincount(notes.track, weights=notes.pitch, minlength=num_tracks)
+    avg_pitch = sums / np.maximum(counts, 1)
+
+    highs = np.zeros(num_tracks, dtype=np.int32)
+    lows = np.full(num_tracks, 127, dtype=np.int32)
+    np.maximum.at(highs, notes.track, notes.pitch)
+    np.minimum.at(lows, notes.track, notes.pitch)
+    pitched = (counts > 0) & ~notes.track_is_drum
+    pitch_range = np.where(pitched, highs - lows, 0)
+
+    return {
+        'counts': counts,
+        'pitched': pitched,
+        'avg_pitch': avg_pitch,
+        'pitch_range': pitch_range,
+    }
 
-def analyze_content_type(score: stream.Stream) -> Dict[str, Any]:
+
+def chordal_tracks(notes: NoteArray) -> np.ndarray:
     """
-    Analyze the content type of a music21 score.
+    Flag tracks where some onset holds more than one of their notes.
 
     Returns:
-        Dict with detected content type and track info
+        Bool array indexed by track
     """
-    parts = score.parts
+    num_tracks = notes.num_tracks
+    same_onset = np.diff(notes.start) == 0
+
+    # Single track: any repeated onset will do
+    if num_tracks == 1:
+        return np.array([bool(same_onset.any())])
+
+    # Notes are sorted by onset, so a running count gives dense onset ids and
+    # a single bincount over (onset, track) pairs finds the co-onset groups
+    onset_ids = np.concatenate(([0], np.cumsum(~same_onset)))[:notes.start.size]
+    pair_counts = np.bincount(onset_ids * num_tracks + notes.track)
+    is_chordal = np.zeros(num_tracks, dtype=bool)
+    is_chordal[np.flatnonzero(pair_counts > 1) % num_tracks] = True
+    return is_chordal
+
 
+def analyze_content_type(notes: NoteArray) -> Dict[str, Any]:
+    """
+    Analyze the content type of parsed MIDI notes.
+
+    Returns:
+        Dict with detected content type and track info
+    """
     analysis = {
-        'num_parts': len(parts),
+        'num_parts': notes.num_tracks,
         'has_chords': False,
         'has_melody': False,
         'has_bass': False,
         'parts_info': []
     }
 
-    for part in parts:
+    # No notes at all: nothing to classify
+    if not notes.pitch.size:
+        analysis['parts_info'] = [
+            {
+                'instrument': str(name) or f'Program {program}',
+                'notes_count': 0,
+                'avg_pitch': None,
+                'pitch_range': None
+            }
+            for name, program in zip(notes.track_names, notes.track_programs)
+        ]
+        analysis['detected_type'] = 'unknown'
+        return analysis
+
+    stats = track_pitch_stats(notes)
+
+    # The co-onset check is only needed for tracks in the mid (chord) range
+    mid_range = stats['pitched'] & (stats['avg_pitch'] >= 48) & (stats['avg_pitch'] <= 72)
+    is_chordal = chordal_tracks(notes) if mid_range.any() else mid_range
+
+    for i in range(notes.num_tracks):
         part_info = {
-            'instrument': str(part.getInstrument()),
-            'notes_count': len(part.flatten().notes),
+            'instrument': str(notes.track_names[i]) or f'Program {notes.track_programs[i]}',
+            'notes_count': int(stats['counts'][i]),
             'avg_pitch': None,
             'pitch_range': None
         }
 
-        # Get pitch statistics
-        pitches = [n.pitch.midi for n in part.flatten().notes if hasattr(n, 'pitch')]
-        if pitches:
-            part_info['avg_pitch'] = sum(pitches) / len(pitches)
-            part_info['pitch_range'] = max(pitches) - min(pitches)
+        # Get pitch statistics (drum tracks have none and get no role)
+        if stats['pitched'][i]:
+            part_info['avg_pitch'] = float(stats['avg_pitch'][i])
+            part_info['pitch_range'] = int(stats['pitch_range'][i])
 
             # Classify by pitch range
             avg_pitch = part_info['avg_pitch']
@@ -59,8 +122,7 @@ def analyze_content_type(score: stream.Stream) -> Dict[str, Any]:
                 part_info['role'] = 'melody'
             else:
                 # Check if it's chordal (multiple simultaneous notes)
-                chordified = part.chordify()
-                if len(chordified.flatten().getElementsByClass('Chord')) > 0:
+                if is_chordal[i]:
                     analysis['has_chords'] = True
                     part_info['role'] = 'chords'
                 else:
@@ -106,8 +168,7 @@ def score_content_type(output: Dict[str, Any], expected: Dict[str, Any]) -> Dict
                 'reason': 'No MIDI data in output'
             }
 
-        score_stream = parse_midi_base64(midi_data)
-        analysis = analyze_content_type(score_stream)
+        analysis = analyze_content_type(load_notes(midi_data))
 
         expected_type = expected.get('content_type', 'chords')
         detected_type = analysis['detected_type']
@@ -3,71 +3,56 @@ Key/Scale Validation Scorer
 Evaluates whether the generated MIDI matches the requested key and scale.
 """
 
-from music21 import converter, key, stream
-from typing import Dict, Any
-import base64
-import io
+import re
 
+from typing import Dict, Any, Optional, Tuple
 
-def parse_midi_base64(midi_base64: str) -> stream.Stream:
-    """Parse base64-encoded MIDI data into music21 Stream."""
-    midi_bytes = base64.b64decode(midi_base64)
-    return converter.parse(io.BytesIO(midi_bytes))
+from ._midi_io import NoteArray, krumhansl_key, load_notes
 
 
-def detect_key(score: stream.Stream) -> key.Key:
-    """Detect the key of a music21 score."""
-    # Try to get key from score
-    existing_key = score.analyze('key')
-    return existing_key
+_LETTER_PC = {'C': 0, 'D': 2, 'E': 4, 'F': 5, 'G': 7, 'A': 9, 'B': 11}
+_ACCIDENTAL_OFFSETS = {'#': 1, '♯': 1, 'sharp': 1, 'b': -1, '♭': -1, '-': -1, 'flat': -1}
+# Spelled-out accidentals (optionally after '-' or spaces) must be tried
+# before the bare '-' flat, or 'F-sharp' would read as F-flat
+_KEY_RE = re.compile(r'([A-G])(#|♯|b|♭|[\s-]*sharp|[\s-]*flat|-)?', re.IGNORECASE)
 
 
-def normalize_key_name(key_name: str) -> str:
-    """Normalize key names for comparison (e.g., 'C#' -> 'C♯', 'Bb' -> 'B♭')."""
-    replacements = {
-        '#': '♯',
-        'b': '♭',
-        'sharp': '♯',
-        'flat': '♭'
-    }
+def detect_key(notes: NoteArray) -> Optional[Tuple[str, str]]:
+    """
+    Detect the key of parsed MIDI notes.
+    Correlates the duration-weighted pitch-class histogram against the
+    Krumhansl-Kessler profiles. These replace the Aarden-Essen weighting
+    music21's analyze('key') uses, so results can differ from music21's.
+
+    Returns:
+        (tonic_name, mode) tuple, e.g. ('A', 'minor'), or None if the
+        MIDI has no pitched (non-drum) notes
+    """
+    pitched = ~notes.track_is_drum[notes.track]
+    return krumhansl_key(notes.pitch[pitched], weights=notes.duration[pitched])
+
 
-    normalized = key_name
-    for old, new in replacements.items():
-        normalized = normalized.replace(old, new)
+def key_to_pc(key_name: str) -> Optional[int]:
+    """
+    Convert a tonic name to its pitch class (0-11).
+    Accepts '#'/'♯'/'sharp' and 'b'/'♭'/'flat'/'-' accidentals, with
+    spelled-out ones optionally joined by a space or hyphen ('F-sharp'),
+    so enharmonic spellings ('C#', 'Db', 'D-') map to the same pitch class.
+    Returns None if the name does not start with a note letter.
+    """
+    match = _KEY_RE.match(key_name.strip())
+    if not match:
+        return None
 
-    return normalized.strip()
+    letter, accidental = match.groups()
+    offset = _ACCIDENTAL_OFFSETS[accidental.lstrip(' \t-').lower() or '-'] if accidental else 0
+    return (_LETTER_PC[letter.upper()] + offset) % 12
 
 
 def keys_match(detected: str, expected: str) -> bool:
-    """Check if two key names represent the same key."""
-    detected_norm = normalize_key_name(detected).upper()
-    expected_norm = normalize_key_name(expected).upper()
-
-    # Direct match
-    if detected_norm == expected_norm:
-        return True
-
-    # Handle enharmonic equivalents
-    enharmonics = {
-        'C♯': 'D♭',
-        'D♭': 'C♯',
-        'D♯': 'E♭',
-        'E♭': 'D♯',
-        'F♯': 'G♭',
-        'G♭': 'F♯',
-        'G♯': 'A♭',
-        'A♭': 'G♯',
-        'A♯': 'B♭',
-        'B♭': 'A♯',
-    }
-
-    for norm in [detected_norm, expected_norm]:
-        # Remove 'MAJOR' or 'MINOR' suffix for comparison
-        clean = norm.replace(' MAJOR', '').replace(' MINOR', '')
-        if clean in enharmonics and enharmonics[clean] in [detected_norm, expected_norm]:
-            return True
-
-    return False
+    """Check if two key names represent the same key (enharmonics included)."""
+    detected_pc = key_to_pc(detected)
+    return detected_pc is not None and detected_pc == key_to_pc(expected)
 
 
 def score_key_validation(output: Dict[str, Any], expected: Dict[str, Any]) -> Dict[str, Any]:
@@ -90,8 +75,13 @@ def score_key_validation(output: Dict[str, Any], expected: Dict[str, Any]) -> Di
                 'reason': 'No MIDI data in output'
             }
 
-        score_stream = parse_midi_base64(midi_data)
-        detected_key = detect_key(score_stream)
+        detected = detect_key(load_notes(midi_data))
+        if detected is None:
+            return {
+                'score': 0.0,
+                'reason': 'No pitched notes to detect a key from'
+            }
+        detected_tonic, detected_mode = detected
 
         # Expected key and scale
         expected_key = expected.get('key', '')
@@ -101,8 +91,6 @@ def score_key_validation(output: Dict[str, Any], expected: Dict[str, Any]) -> Di
         expected_key_full = f"{expected_key} {expected_scale}"
 
         # Check if keys match
-        detected_tonic = detected_key.tonic.name
-        detected_mode = detected_key.mode
         detected_key_str = f"{detected_tonic} {detected_mode}"
 
         # Compare tonic
@@ -0,0 +1,19 @@
+"""
+Builds the optional Cython scorer kernels (scorers/_kernels_c.pyx).
+
+    cd evals/openai_evals
+    python setup_kernels.py build_ext --inplace
+
+Without the compiled extension the scorers fall back to Numba or NumPy.
+"""
+
+from Cython.Build import cythonize
+from setuptools import Extension, setup
+
+setup(
+    name='aideas-scorer-kernels',
+    ext_modules=cythonize(
+        [Extension('scorers._kernels_c', ['scorers/_kernels_c.pyx'])],
+        language_level=3,
+    ),
+)
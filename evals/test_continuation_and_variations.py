@@ -5,14 +5,17 @@ Tests the specific use cases we've been working on.
 """
 
 import json
-import requests
-import time
-from typing import Dict, List, Any
+from functools import partial
+from typing import Callable, Dict, List, Any
+
+from _common import SESSION, post, run_concurrently
 
 # API configuration
 API_BASE_URL = "http://localhost:8080"
 API_KEY = "your-api-key-here"  # Replace with actual API key
 
+SESSION.headers["Authorization"] = f"Bearer {API_KEY}"
+
 def make_request(input_array: List[Dict[str, Any]], mode: str = "one_shot") -> Dict[str, Any]:
     """Make a request to the API with the given input array."""
     payload = {
@@ -22,12 +25,7 @@ def make_request(input_array: List[Dict[str, Any]], mode: str = "one_shot") -> D
         "stream": False
     }
 
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {API_KEY}"
-    }
-
-    response = requests.post(f"{API_BASE_URL}/api/v1/generations", json=payload, headers=headers)
+    response = post(f"{API_BASE_URL}/api/v1/generations", json=payload)
     response.raise_for_status()
     return response.json()
 
@@ -204,6 +202,16 @@ def test_raw_input_array_preservation():
         print(f"❌ Raw input array preservation test FAILED: {e}")
         return False
 
+def _run_test(test: Callable[[], bool]) -> bool:
+    """Run one test, reporting a crash as a failure so the other tests still count."""
+    try:
+        ok = bool(test())
+    except Exception as e:
+        print(f"❌ Test {test.__name__} crashed: {e}")
+        ok = False
+    print()  # Add spacing between tests
+    return ok
+
 def run_all_tests():
     """Run all eval tests."""
     print("🚀 Starting continuation and variations eval tests...\n")
@@ -214,16 +222,11 @@ def run_all_tests():
         test_raw_input_array_preservation
     ]
 
-    passed = 0
     total = len(tests)
 
-    for test in tests:
-        try:
-            if test():
-                passed += 1
-            print()  # Add spacing between tests
-        except Exception as e:
-            print(f"❌ Test {test.__name__} crashed: {e}\n")
+    # Tests are independent and I/O-bound, so run them concurrently; each
+    # one's output is printed as a block
+    passed = sum(run_concurrently([partial(_run_test, test) for test in tests]))
 
     print(f"📊 Results: {passed}/{total} tests passed")
 
@@ -8,45 +8,35 @@ Tests both formats with the same input and compares:
 """
 
 import json
-import os
-import requests
 import sys
 import time
-from typing import Dict, Any, Tuple
-
-API_BASE_URL = os.getenv("AIDEAS_API_URL", "http://localhost:8080")
-EMAIL = os.getenv("AIDEAS_EMAIL")
-PASSWORD = os.getenv("AIDEAS_PASSWORD")
-
-def register_or_login() -> str:
-    """Register beta user or login if already exists, return access token."""
-    # Try to register as beta user first
-    response = requests.post(
-        f"{API_BASE_URL}/api/auth/register/beta",
-        json={"email": EMAIL, "password": PASSWORD}
-    )
-
-    if response.status_code == 200:
-        print("✅ Registered new beta user")
-        data = response.json()
-        return data["access_token"]
-
-    # If registration failed, try login
-    if "already exists" in response.text.lower():
-        print("ℹ️  User exists, logging in...")
-        response = requests.post(
-            f"{API_BASE_URL}/api/auth/login",
-            json={"email": EMAIL, "password": PASSWORD}
-        )
-        response.raise_for_status()
-        data = response.json()
-        return data["access_token"]
-
-    # Something else went wrong
-    response.raise_for_status()
-    return ""
-
-def test_output_format(token: str, output_format: str, test_name: str) -> Dict[str, Any]:
+from functools import partial
+from typing import Dict, Any
+
+from _common import (
+    API_BASE_URL,
+    EMAIL,
+    PASSWORD,
+    authenticate,
+    iter_sse_events,
+    post,
+    run_concurrently,
+    stream_post,
+)
+
+# Request message contents are literals, so serialize them once at import
+CHORD_PROMPT_CONTENT = json.dumps({
+    "user_prompt": "Create a simple 2-bar C major chord progression with 3-4 notes per chord",
+    "bpm": 120,
+    "variations": 1
+})
+BASSLINE_PROMPT_CONTENT = json.dumps({
+    "user_prompt": "Create a simple bassline in C minor with 4-6 notes",
+    "bpm": 120,
+    "variations": 1
+})
+
+def test_output_format(output_format: str, test_name: str) -> Dict[str, Any]:
     """Test generation with a specific output format and return metrics."""
     print(f"\n🔧 Testing {test_name} (output_format={output_format})...")
 
@@ -57,29 +47,20 @@ def test_output_format(token: str, output_format: str, test_name: str) -> Dict[s
         "input_array": [
             {
                 "role": "user",
-                "content": json.dumps({
-                    "user_prompt": "Create a simple 2-bar C major chord progression with 3-4 notes per chord",
-                    "bpm": 120,
-                    "variations": 1
-                })
+                "content": CHORD_PROMPT_CONTENT
             }
         ],
         "stream": False
     }
-
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {token}"
-    }
+    body = json.dumps(payload).encode("utf-8")
 
     # Measure timing
-    start_time = time.time()
-    response = requests.post(
+    start_time = time.perf_counter()
+    response = post(
         f"{API_BASE_URL}/api/v1/generations",
-        json=payload,
-        headers=headers
+        data=body
     )
-    elapsed_time = time.time() - start_time
+    elapsed_time = time.perf_counter() - start_time
     response.raise_for_status()
     result = response.json()
 
@@ -113,7 +94,7 @@ def test_output_format(token: str, output_format: str, test_name: str) -> Dict[s
     print(f"   ✅ Success - {metrics['notes_count']} notes, {metrics['output_tokens']} output tokens, {elapsed_time:.2f}s")
     return metrics
 
-def test_streaming_output_format(token: str, output_format: str, test_name: str) -> Dict[str, Any]:
+def test_streaming_output_format(output_format: str, test_name: str) -> Dict[str, Any]:
     """Test streaming generation with a specific output format and return metrics."""
     print(f"\n🔧 Testing STREAMING {test_name} (output_format={output_format})...")
 
@@ -124,63 +105,42 @@ def test_streaming_output_format(token: str, output_format: str, test_name: str)
         "input_array": [
             {
                 "role": "user",
-                "content": json.dumps({
-                    "user_prompt": "Create a simple bassline in C minor with 4-6 notes",
-                    "bpm": 120,
-                    "variations": 1
-                })
+                "content": BASSLINE_PROMPT_CONTENT
             }
         ],
         "stream": True
     }
-
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {token}"
-    }
+    body = json.dumps(payload).encode("utf-8")
 
     # Measure timing
-    start_time = time.time()
+    start_time = time.perf_counter()
     first_token_time = None
 
-    response = requests.post(
-        f"{API_BASE_URL}/api/v1/generations",
-        json=payload,
-        headers=headers,
-        stream=True
-    )
-    response.raise_for_status()
+    def mark_first_byte():
+        nonlocal first_token_time
+        first_token_time = time.perf_counter() - start_time
 
     events_received = 0
     completed = False
     final_result = None
 
-    for line in response.iter_lines():
-        if not line:
-            continue
-
-        if first_token_time is None:
-            first_token_time = time.time() - start_time
-
-        line = line.decode('utf-8')
-        if line.startswith('data: '):
-            data_str = line[6:]  # Remove 'data: ' prefix
-            try:
-                event = json.loads(data_str)
-                events_received += 1
-
-                if event.get('type') == 'completed':
-                    completed = True
-                    final_result = event.get('data', {})
-                    break
-                elif event.get('type') == 'done':
-                    completed = True
-                    final_result = event.get('data', {})
-                    break
-            except json.JSONDecodeError:
-                continue
-
-    elapsed_time = time.time() - start_time
+    # Leaving the block closes the response, which hands the connection back
+    # to the pool even when we stop reading mid-stream
+    with stream_post(f"{API_BASE_URL}/api/v1/generations", body) as response:
+        response.raise_for_status()
+        for event in iter_sse_events(response, on_first_byte=mark_first_byte):
+            events_received += 1
+
+            if event.get('type') == 'completed':
+                completed = True
+                final_result = event.get('data', {})
+                break
+            elif event.get('type') == 'done':
+                completed = True
+                final_result = event.get('data', {})
+                break
+
+    elapsed_time = time.perf_counter() - start_time
 
     if not completed or not final_result:
         print(f"   ❌ FAILED - Stream ended without completion event")
@@ -282,7 +242,7 @@ def main():
     try:
         # Authenticate
         print("🔐 Authenticating...")
-        token = register_or_login()
+        authenticate()
         print("✅ Authentication successful")
         print()
 
@@ -291,17 +251,14 @@ def main():
             "streaming": {}
         }
 
-        # Test non-streaming DSL
+        # Test non-streaming DSL and JSON Schema side by side
         print("=" * 60)
         print("NON-STREAMING TESTS")
         print("=" * 60)
-        results["non_streaming"]["dsl"] = test_output_format(token, "dsl", "DSL Format")
-
-        # Small delay between tests
-        time.sleep(2)
-
-        # Test non-streaming JSON Schema
-        results["non_streaming"]["json"] = test_output_format(token, "json_schema", "JSON Schema Format")
+        results["non_streaming"]["dsl"], results["non_streaming"]["json"] = run_concurrently([
+            partial(test_output_format, "dsl", "DSL Format"),
+            partial(test_output_format, "json_schema", "JSON Schema Format"),
+        ])
 
         # Compare non-streaming results
         compare_results(
@@ -310,17 +267,14 @@ def main():
             "Non-Streaming"
         )
 
-        # Test streaming DSL
+        # Test streaming DSL and JSON Schema side by side
         print("\n" + "=" * 60)
         print("STREAMING TESTS")
         print("=" * 60)
-        results["streaming"]["dsl"] = test_streaming_output_format(token, "dsl", "DSL Format")
-
-        # Small delay between tests
-        time.sleep(2)
-
-        # Test streaming JSON Schema
-        results["streaming"]["json"] = test_streaming_output_format(token, "json_schema", "JSON Schema Format")
+        results["streaming"]["dsl"], results["streaming"]["json"] = run_concurrently([
+            partial(test_streaming_output_format, "dsl", "DSL Format"),
+            partial(test_streaming_output_format, "json_schema", "JSON Schema Format"),
+        ])
 
         # Compare streaming results
         compare_results(
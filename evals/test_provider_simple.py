@@ -5,43 +5,32 @@ Tests both non-streaming and streaming generation.
 """
 
 import json
-import os
-import requests
 import sys
 
-API_BASE_URL = os.getenv("AIDEAS_API_URL", "http://localhost:8080")
-EMAIL = os.getenv("AIDEAS_EMAIL")
-PASSWORD = os.getenv("AIDEAS_PASSWORD")
-
-def register_or_login() -> str:
-    """Register beta user or login if already exists, return access token."""
-    # Try to register as beta user first
-    response = requests.post(
-        f"{API_BASE_URL}/api/auth/register/beta",
-        json={"email": EMAIL, "password": PASSWORD}
-    )
-
-    if response.status_code == 200:
-        print("✅ Registered new beta user")
-        data = response.json()
-        return data["access_token"]
-
-    # If registration failed, try login
-    if "already exists" in response.text.lower():
-        print("ℹ️  User exists, logging in...")
-        response = requests.post(
-            f"{API_BASE_URL}/api/auth/login",
-            json={"email": EMAIL, "password": PASSWORD}
-        )
-        response.raise_for_status()
-        data = response.json()
-        return data["access_token"]
-
-    # Something else went wrong
-    response.raise_for_status()
-    return ""
-
-def test_non_streaming(token: str):
+from _common import (
+    API_BASE_URL,
+    EMAIL,
+    PASSWORD,
+    authenticate,
+    iter_sse_events,
+    post,
+    run_concurrently,
+    stream_post,
+)
+
+# Request message contents are literals, so serialize them once at import
+CHORD_PROMPT_CONTENT = json.dumps({
+    "user_prompt": "Create a simple 2-bar chord progression in C major",
+    "bpm": 120,
+    "variations": 1
+})
+BASSLINE_PROMPT_CONTENT = json.dumps({
+    "user_prompt": "Create a simple bassline in C minor",
+    "bpm": 120,
+    "variations": 1
+})
+
+def test_non_streaming():
     """Test non-streaming generation."""
     print("🎵 Testing non-streaming generation...")
 
@@ -51,22 +40,14 @@ def test_non_streaming(token: str):
         "input_array": [
             {
                 "role": "user",
-                "content": json.dumps({
-                    "user_prompt": "Create a simple 2-bar chord progression in C major",
-                    "bpm": 120,
-                    "variations": 1
-                })
+                "content": CHORD_PROMPT_CONTENT
             }
         ],
         "stream": False
     }
+    body = json.dumps(payload).encode("utf-8")
 
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {token}"
-    }
-
-    response = requests.post(f"{API_BASE_URL}/api/v1/generations", json=payload, headers=headers)
+    response = post(f"{API_BASE_URL}/api/v1/generations", data=body)
     response.raise_for_status()
     result = response.json()
 
@@ -82,7 +63,7 @@ def test_non_streaming(token: str):
     print(f"   Description: {choice['description'][:80]}...")
     return True
 
-def test_streaming(token: str):
+def test_streaming():
     """Test streaming generation."""
     print("🎵 Testing streaming generation...")
 
@@ -92,49 +73,27 @@ def test_streaming(token: str):
         "input_array": [
             {
                 "role": "user",
-                "content": json.dumps({
-                    "user_prompt": "Create a simple bassline in C minor",
-                    "bpm": 120,
-                    "variations": 1
-                })
+                "content": BASSLINE_PROMPT_CONTENT
             }
         ],
         "stream": True
     }
-
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {token}"
-    }
-
-    # For streaming, we need to handle SSE
-    response = requests.post(
-        f"{API_BASE_URL}/api/v1/generations",
-        json=payload,
-        headers=headers,
-        stream=True
-    )
-    response.raise_for_status()
+    body = json.dumps(payload).encode("utf-8")
 
     events_received = 0
     completed = False
 
-    for line in response.iter_lines():
-        if not line:
-            continue
-
-        line = line.decode('utf-8')
-        if line.startswith('data: '):
-            data_str = line[6:]  # Remove 'data: ' prefix
-            try:
-                event = json.loads(data_str)
-                events_received += 1
-                if event.get('type') == 'completed':
-                    completed = True
-                    print(f"✅ Streaming test PASSED - Received {events_received} events")
-                    return True
-            except json.JSONDecodeError:
-                continue
+    # For streaming, we need to handle SSE. Leaving the block closes the
+    # response, which hands the connection back to the pool even when we
+    # stop reading mid-stream
+    with stream_post(f"{API_BASE_URL}/api/v1/generations", body) as response:
+        response.raise_for_status()
+        for event in iter_sse_events(response):
+            events_received += 1
+            if event.get('type') == 'completed':
+                completed = True
+                print(f"✅ Streaming test PASSED - Received {events_received} events")
+                return True
 
     if not completed:
         print(f"❌ Streaming test FAILED - Stream ended without completion event")
@@ -152,15 +111,12 @@ if __name__ == "__main__":
     try:
         # Register or login
         print("🔐 Authenticating...")
-        token = register_or_login()
+        authenticate()
         print("✅ Authentication successful")
         print()
 
-        # Run tests
-        results = []
-        results.append(test_non_streaming(token))
-        print()
-        results.append(test_streaming(token))
+        # Run both tests concurrently; each prints its output as one block
+        results = run_concurrently([test_non_streaming, test_streaming])
         print()
 
         # Summary
@@ -5,62 +5,74 @@ Tests whether the AI maintains the original timing patterns when continuing sequ
 """
 
 import json
+import numpy as np
 import requests
 from typing import List, Dict, Any
 
+# Input patterns are built once at import; treat them as read-only
+# Test case 1: Quarter note pattern
+QUARTER_NOTE_PATTERN = (
+    {"midiNoteNumber": 60, "velocity": 100, "startBeats": 0.0, "durationBeats": 1.0},
+    {"midiNoteNumber": 64, "velocity": 100, "startBeats": 0.0, "durationBeats": 1.0},
+    {"midiNoteNumber": 67, "velocity": 100, "startBeats": 0.0, "durationBeats": 1.0},
+    {"midiNoteNumber": 57, "velocity": 100, "startBeats": 1.0, "durationBeats": 1.0},
+    {"midiNoteNumber": 60, "velocity": 100, "startBeats": 1.0, "durationBeats": 1.0},
+    {"midiNoteNumber": 64, "velocity": 100, "startBeats": 1.0, "durationBeats": 1.0},
+)
+
+# Test case 2: Mixed duration pattern
+MIXED_PATTERN = (
+    {"midiNoteNumber": 60, "velocity": 100, "startBeats": 0.0, "durationBeats": 2.0},
+    {"midiNoteNumber": 64, "velocity": 100, "startBeats": 0.0, "durationBeats": 2.0},
+    {"midiNoteNumber": 67, "velocity": 100, "startBeats": 0.0, "durationBeats": 2.0},
+    {"midiNoteNumber": 57, "velocity": 100, "startBeats": 2.5, "durationBeats": 0.5},
+    {"midiNoteNumber": 60, "velocity": 100, "startBeats": 2.5, "durationBeats": 0.5},
+    {"midiNoteNumber": 64, "velocity": 100, "startBeats": 2.5, "durationBeats": 0.5},
+)
+
+# Syncopated pattern used by test_rhythmic_continuity
+SYNCOPATED_PATTERN = (
+    {"midiNoteNumber": 60, "velocity": 100, "startBeats": 0.0, "durationBeats": 1.0},
+    {"midiNoteNumber": 64, "velocity": 100, "startBeats": 0.0, "durationBeats": 1.0},
+    {"midiNoteNumber": 67, "velocity": 100, "startBeats": 0.0, "durationBeats": 1.0},
+    {"midiNoteNumber": 57, "velocity": 100, "startBeats": 1.5, "durationBeats": 0.5},  # Syncopated
+    {"midiNoteNumber": 60, "velocity": 100, "startBeats": 1.5, "durationBeats": 0.5},
+    {"midiNoteNumber": 64, "velocity": 100, "startBeats": 1.5, "durationBeats": 0.5},
+)
+
 def analyze_timing_patterns(notes: List[Dict[str, Any]]) -> Dict[str, Any]:
     """Analyze the timing patterns in a sequence of notes."""
     if not notes:
         return {}
 
-    # Extract timing data
-    start_beats = [note["startBeats"] for note in notes]
-    durations = [note["durationBeats"] for note in notes]
+    # Extract timing data in one pass into an (N, 2) array
+    timing = np.fromiter(
+        ((note["startBeats"], note["durationBeats"]) for note in notes),
+        dtype=np.dtype((np.float64, 2)),
+        count=len(notes)
+    )
+    start_beats = timing[:, 0]
+    durations = timing[:, 1]
 
-    # Calculate gaps between notes
-    gaps = []
-    for i in range(1, len(start_beats)):
-        prev_end = start_beats[i-1] + durations[i-1]
-        current_start = start_beats[i]
-        gap = current_start - prev_end
-        gaps.append(gap)
+    # Gap between each note's end and the next note's start
+    gaps = start_beats[1:] - (start_beats[:-1] + durations[:-1])
 
     return {
-        "avg_duration": sum(durations) / len(durations),
-        "duration_variance": sum((d - sum(durations)/len(durations))**2 for d in durations) / len(durations),
-        "avg_gap": sum(gaps) / len(gaps) if gaps else 0,
-        "gap_variance": sum((g - sum(gaps)/len(gaps))**2 for g in gaps) / len(gaps) if gaps else 0,
-        "common_durations": list(set(durations)),
-        "rhythmic_density": len(notes) / (max(start_beats) + max(durations)) if notes else 0
+        "avg_duration": float(durations.mean()),
+        "duration_variance": float(durations.var()),
+        "avg_gap": float(gaps.mean()) if gaps.size else 0,
+        "gap_variance": float(gaps.var()) if gaps.size else 0,
+        "common_durations": np.unique(durations).tolist(),
+        "rhythmic_density": len(notes) / float(start_beats.max() + durations.max())
     }
 
 def test_timing_preservation():
     """Test that continuation preserves the original timing patterns."""
     print("🎵 Testing timing pattern preservation...")
 
-    # Test case 1: Quarter note pattern
-    quarter_note_pattern = [
-        {"midiNoteNumber": 60, "velocity": 100, "startBeats": 0.0, "durationBeats": 1.0},
-        {"midiNoteNumber": 64, "velocity": 100, "startBeats": 0.0, "durationBeats": 1.0},
-        {"midiNoteNumber": 67, "velocity": 100, "startBeats": 0.0, "durationBeats": 1.0},
-        {"midiNoteNumber": 57, "velocity": 100, "startBeats": 1.0, "durationBeats": 1.0},
-        {"midiNoteNumber": 60, "velocity": 100, "startBeats": 1.0, "durationBeats": 1.0},
-        {"midiNoteNumber": 64, "velocity": 100, "startBeats": 1.0, "durationBeats": 1.0},
-    ]
-
-    # Test case 2: Mixed duration pattern
-    mixed_pattern = [
-        {"midiNoteNumber": 60, "velocity": 100, "startBeats": 0.0, "durationBeats": 2.0},
-        {"midiNoteNumber": 64, "velocity": 100, "startBeats": 0.0, "durationBeats": 2.0},
-        {"midiNoteNumber": 67, "velocity": 100, "startBeats": 0.0, "durationBeats": 2.0},
-        {"midiNoteNumber": 57, "velocity": 100, "startBeats": 2.5, "durationBeats": 0.5},
-        {"midiNoteNumber": 60, "velocity": 100, "startBeats": 2.5, "durationBeats": 0.5},
-        {"midiNoteNumber": 64, "velocity": 100, "startBeats": 2.5, "durationBeats": 0.5},
-    ]
-
     test_cases = [
-        ("quarter_note", quarter_note_pattern),
-        ("mixed_duration", mixed_pattern)
+        ("quarter_note", QUARTER_NOTE_PATTERN),
+        ("mixed_duration", MIXED_PATTERN)
     ]
 
     for test_name, original_pattern in test_cases:
@@ -105,18 +117,9 @@ def test_rhythmic_continuity():
     """Test that continuation maintains rhythmic continuity."""
     print("\n🎵 Testing rhythmic continuity...")
 
-    # Test syncopated pattern
-    syncopated_pattern = [
-        {"midiNoteNumber": 60, "velocity": 100, "startBeats": 0.0, "durationBeats": 1.0},
-        {"midiNoteNumber": 64, "velocity": 100, "startBeats": 0.0, "durationBeats": 1.0},
-        {"midiNoteNumber": 67, "velocity": 100, "startBeats": 0.0, "durationBeats": 1.0},
-        {"midiNoteNumber": 57, "velocity": 100, "startBeats": 1.5, "durationBeats": 0.5},  # Syncopated
-        {"midiNoteNumber": 60, "velocity": 100, "startBeats": 1.5, "durationBeats": 0.5},
-        {"midiNoteNumber": 64, "velocity": 100, "startBeats": 1.5, "durationBeats": 0.5},
-    ]
-
     print("📝 Testing syncopated pattern continuation...")
-    print("   Original syncopation at beat 1.5")
+    offbeat_starts = sorted({note["startBeats"] for note in SYNCOPATED_PATTERN if note["startBeats"] % 1})
+    print(f"   Original syncopation at beat {', '.join(f'{b:g}' for b in offbeat_starts)}")
     print("   ✅ Would verify continuation maintains syncopated feel")
 
     return True